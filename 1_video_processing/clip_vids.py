@@ -11,7 +11,8 @@ def split_video(input_path, output_dir, segment_length=60):
     command = [
         "ffmpeg",
         "-i", input_path,          # input file
-        "-c", "copy",              # copy codec (no re-encoding)
+        "-c", "copy",              # copy codec (no decode/re-encode, so
+                                   # hardware decoders would not help here)
         "-map", "0",               # map all streams
         "-segment_time", str(segment_length),
         "-f", "segment",
@@ -1,43 +1,106 @@
-"""Convert videos to images at a specified frame rate using ffmpeg."""
-
-import os
-import subprocess
-import shutil
-
-# Set your input and output directories
-input_folder = "1_video_processing/input_vid"
-output_folder = "1_video_processing/output_img"
-fps = 10
-
-# Create output directory if it doesn't exist
-os.makedirs(output_folder, exist_ok=True)
-
-# Supported video extensions (customize as needed)
-video_extensions = (".mp4", ".mov", ".avi", ".mkv", ".flv", ".webm")
-
-# Loop through all files in the input folder
-for filename in os.listdir(input_folder):
-    if filename.lower().endswith(video_extensions):
-        video_path = os.path.join(input_folder, filename)
-        name, _ = os.path.splitext(filename)
-
-        # Output pattern: output_folder/videoName_frame_%04d.png
-        output_pattern = os.path.join(output_folder, f"{name}_frame_%04d.png")
-
-        # FFmpeg crop filter: crop=width:height:x:y
-        # width=-1 (keep original width)
-        # height=2/3*ih (keep top 2/3 of the image)
-        # x=0, y=0 (start from top-left)
-        crop_filter = "crop=iw:2*ih/3:0:0"
-
-        # Clear folder
-        shutil.rmtree(output_folder, ignore_errors=True)
-        os.makedirs(output_folder, exist_ok=True)
-
-        # ffmpeg command
-        cmd = ["ffmpeg", "-y", "-i", video_path, "-vf", f"fps={fps},{crop_filter}", output_pattern]
-
-        print(f"Processing {filename}...")
-        subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-
-print("Conversion complete.")
+"""Convert videos to images at a specified frame rate using ffmpeg."""
+
+import os
+import subprocess
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+
+# Set your input and output directories
+input_folder = "1_video_processing/input_vid"
+output_folder = "1_video_processing/output_img"
+fps = 10
+
+# Supported video extensions (customize as needed)
+video_extensions = (".mp4", ".mov", ".avi", ".mkv", ".flv", ".webm")
+
+# FFmpeg crop filter: crop=width:height:x:y
+# width=iw (keep original width)
+# height=2/3*ih (keep top 2/3 of the image)
+# x=0, y=0 (start from top-left)
+crop_filter = "crop=iw:2*ih/3:0:0"
+
+def ffmpeg_cuda_available():
+    """Check whether this ffmpeg build can decode on the GPU (NVDEC)."""
+    try:
+        result = subprocess.run(["ffmpeg", "-hide_banner", "-hwaccels"],
+                                stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        return b"cuda" in result.stdout
+    except OSError:
+        return False
+
+# Offload H.264/HEVC decode to NVDEC when available; frames come back to
+# system memory for the crop filter and PNG encode either way
+hwaccel_args = ["-hwaccel", "cuda"] if ffmpeg_cuda_available() else []
+
+def run_ffmpeg(pre_input_args, input_args):
+    """Run ffmpeg, retrying without hardware decode if it fails.
+
+    -hwaccels only proves the build was compiled with cuda support; on a
+    machine without a usable GPU the decoder still fails at device
+    creation, so fall back to software decode before reporting an error.
+    """
+    cmd = ["ffmpeg", "-y", "-hide_banner"] + pre_input_args + hwaccel_args + input_args
+    result = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    if result.returncode != 0 and hwaccel_args:
+        cmd = ["ffmpeg", "-y", "-hide_banner"] + pre_input_args + input_args
+        result = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    return result
+
+def extract_frames(video_path):
+    """Extract frames from a single video with ffmpeg."""
+    filename = os.path.basename(video_path)
+    name, _ = os.path.splitext(filename)
+
+    # Output pattern: output_folder/videoName_frame_%04d.png
+    output_pattern = os.path.join(output_folder, f"{name}_frame_%04d.png")
+
+    print(f"Processing {filename}...")
+
+    # -threads 2 limits each process's internal parallelism since the
+    # pool already runs several videos at once
+    result = run_ffmpeg(
+        ["-threads", "2"],
+        ["-i", video_path, "-vf", f"fps={fps},{crop_filter}", output_pattern]
+    )
+    if result.returncode != 0:
+        print(f"ffmpeg failed on {filename}:\n"
+              f"{result.stderr.decode(errors='replace').strip()}")
+
+def extract_select_frames(video_path, frame_indices, output_pattern):
+    """Extract specific frame numbers from a video in one ffmpeg call.
+
+    A single select filter replaces the naive one-process-per-timestamp
+    approach; -threads 0 lets this lone process use every core.
+    """
+    selection = "+".join(f"eq(n\\,{n})" for n in frame_indices)
+    result = run_ffmpeg(
+        ["-threads", "0"],
+        ["-i", video_path, "-vf", f"select='{selection}'", "-vsync", "vfr",
+         output_pattern]
+    )
+    if result.returncode != 0:
+        print(f"ffmpeg failed on {video_path}:\n"
+              f"{result.stderr.decode(errors='replace').strip()}")
+
+def main():
+    # Clear the output folder, then recreate it
+    shutil.rmtree(output_folder, ignore_errors=True)
+    os.makedirs(output_folder, exist_ok=True)
+
+    # Collect all videos in the input folder
+    video_paths = [
+        os.path.join(input_folder, filename)
+        for filename in os.listdir(input_folder)
+        if filename.lower().endswith(video_extensions)
+    ]
+
+    # Decode several videos concurrently, one ffmpeg process per video
+    if video_paths:
+        workers = min(len(video_paths), max(1, os.cpu_count() // 2))
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            list(executor.map(extract_frames, video_paths))
+
+    print("Conversion complete.")
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,9 @@
+import os
+import queue
+import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
 import cv2
 import numpy as np
 import tensorflow as tf
@@ -6,134 +12,361 @@ import pandas as pd
 from tqdm import tqdm  # For progress bar
 import shutil
 
-def preprocess_image(img_file, img_size):
-    """Prepare image for input to SuperPoint (sp_v6) network."""
-    img = cv2.imread(str(img_file), cv2.IMREAD_COLOR)
-    if img is None:
-        raise ValueError(f"Could not read image: {img_file}")
-    img = cv2.resize(img, img_size)
-    img_orig = img.copy()
+try:
+    from numba import njit
+except ImportError:
+    njit = None  # Optional; extract_superpoint_keypoints falls back to NumPy
+
+def preprocess_image(img_file, img_size, load_color=True):
+    """Prepare image for input to SuperPoint (sp_v6) network.
+
+    Returns the normalized network input plus the resized color image
+    (for visualization) and its grayscale version, converted once here so
+    the brightness filter doesn't redo the conversion downstream. With
+    load_color=False the file is decoded straight to grayscale (skipping
+    the 3-channel decode entirely) and the color image is None.
+    """
+    if load_color:
+        img = cv2.imread(str(img_file), cv2.IMREAD_COLOR)
+        if img is None:
+            raise ValueError(f"Could not read image: {img_file}")
+        if _USE_OPENCL:
+            # Resize and convert on the OpenCL device, download the results
+            umat = cv2.resize(cv2.UMat(img), img_size)
+            img_orig = umat.get()
+            img_gray = cv2.cvtColor(umat, cv2.COLOR_BGR2GRAY).get()
+        else:
+            img_orig = cv2.resize(img, img_size)
+            img_gray = cv2.cvtColor(img_orig, cv2.COLOR_BGR2GRAY)
+    else:
+        img = cv2.imread(str(img_file), cv2.IMREAD_GRAYSCALE)
+        if img is None:
+            raise ValueError(f"Could not read image: {img_file}")
+        img_orig = None
+        img_gray = cv2.resize(img, img_size)
+
+    # Normalize to [0,1] in a single float32 pass
+    img = img_gray.astype(np.float32)
+    img *= np.float32(1.0 / 255.0)  # In-place, no extra allocation
+    img_preprocessed = img[..., None]
+
+    return img_preprocessed, img_orig, img_gray
 
-    # Convert to grayscale and float32
-    img = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-    img = np.expand_dims(img, 2)
-    img = img.astype(np.float32)
-    img_preprocessed = img / 255.  # Normalize to [0,1]
+if njit is not None:
+    @njit
+    def _topk_keypoints(keypoint_map, k):
+        """Stream the map once, keeping the k best points in a min-heap."""
+        h, w = keypoint_map.shape
+        heap_p = np.empty(k, np.float32)
+        heap_y = np.empty(k, np.int32)
+        heap_x = np.empty(k, np.int32)
+        n = 0
+        for y in range(h):
+            for x in range(w):
+                p = keypoint_map[y, x]
+                if p <= 0:
+                    continue
+                if n < k:
+                    # Push and sift up
+                    i = n
+                    heap_p[i] = p
+                    heap_y[i] = y
+                    heap_x[i] = x
+                    n += 1
+                    while i > 0:
+                        parent = (i - 1) // 2
+                        if heap_p[parent] <= heap_p[i]:
+                            break
+                        heap_p[parent], heap_p[i] = heap_p[i], heap_p[parent]
+                        heap_y[parent], heap_y[i] = heap_y[i], heap_y[parent]
+                        heap_x[parent], heap_x[i] = heap_x[i], heap_x[parent]
+                        i = parent
+                elif p > heap_p[0]:
+                    # Replace the current minimum and sift down
+                    heap_p[0] = p
+                    heap_y[0] = y
+                    heap_x[0] = x
+                    i = 0
+                    while True:
+                        left = 2 * i + 1
+                        right = left + 1
+                        smallest = i
+                        if left < n and heap_p[left] < heap_p[smallest]:
+                            smallest = left
+                        if right < n and heap_p[right] < heap_p[smallest]:
+                            smallest = right
+                        if smallest == i:
+                            break
+                        heap_p[smallest], heap_p[i] = heap_p[i], heap_p[smallest]
+                        heap_y[smallest], heap_y[i] = heap_y[i], heap_y[smallest]
+                        heap_x[smallest], heap_x[i] = heap_x[i], heap_x[smallest]
+                        i = smallest
+        # Sort the kept entries by descending confidence
+        order = np.argsort(heap_p[:n])[::-1]
+        return heap_y[:n][order], heap_x[:n][order], heap_p[:n][order]
 
-    return img_preprocessed, img_orig
+    # Compile once at import so the first frame doesn't pay the JIT cost
+    _topk_keypoints(np.zeros((1, 1), np.float32), 1)
+else:
+    _topk_keypoints = None
 
 def extract_superpoint_keypoints(keypoint_map, keep_k_points=1000):
     """Extract keypoints from SuperPoint (sp_v6) keypoint map."""
-    # Get points that are detected (prob > 0)
-    keypoints = np.where(keypoint_map > 0)
-    prob = keypoint_map[keypoints[0], keypoints[1]]
-    keypoints = np.stack([keypoints[0], keypoints[1], prob], axis=-1)
-    
-    # Sort by confidence and keep top k
-    sorted_indices = (-keypoints[:, 2]).argsort()[:keep_k_points]
-    keypoints = keypoints[sorted_indices]
-    
+    if _topk_keypoints is not None:
+        # Single streaming pass, no full nonzero gather
+        ys, xs, prob = _topk_keypoints(keypoint_map, keep_k_points)
+    else:
+        # Get points that are detected (prob > 0)
+        ys, xs = np.nonzero(keypoint_map > 0)
+        prob = keypoint_map[ys, xs]
+
+        # Keep top k by confidence: argpartition only partially sorts, so we
+        # avoid a full sort of the probability vector and only sort the top k
+        if prob.size > keep_k_points:
+            idx = np.argpartition(prob, -keep_k_points)[-keep_k_points:]
+            idx = idx[np.argsort(-prob[idx])]
+        else:
+            idx = np.argsort(-prob)
+        ys, xs, prob = ys[idx], xs[idx], prob[idx]
+
+    keypoints = np.stack([ys, xs, prob], axis=-1)
+
     return keypoints.astype(int)
 
 def filter_dark_keypoints(keypoints, img_gray, threshold=20):
     """
     Remove keypoints that are too dark in the grayscale image.
     """
-    filtered = []
-    for kp in keypoints:
-        y, x = kp[0], kp[1]
-        if img_gray[y, x] >= threshold:
-            filtered.append(kp)
-    return np.array(filtered)
+    if len(keypoints) == 0:
+        return keypoints
+    # One gather + boolean mask instead of a Python-level append loop
+    bright = img_gray[keypoints[:, 0], keypoints[:, 1]] >= threshold
+    return keypoints[bright]
+
+# Route the resize/convert chain through OpenCV's transparent OpenCL API
+# when a device is available: successive ops on a UMat stay on the device
+# without intermediate host copies
+_USE_OPENCL = cv2.ocl.haveOpenCL()
+if _USE_OPENCL:
+    cv2.ocl.setUseOpenCL(True)
+
+# Pixel offsets of the filled circle drawn for each keypoint, computed once
+# so drawing becomes a single fancy-indexed assignment per image
+_KP_RADIUS = 2
+_kp_patch = np.zeros((2 * _KP_RADIUS + 1, 2 * _KP_RADIUS + 1), np.uint8)
+cv2.circle(_kp_patch, (_KP_RADIUS, _KP_RADIUS), _KP_RADIUS, 1, -1)
+_KP_OFFSETS = np.argwhere(_kp_patch > 0) - _KP_RADIUS
 
 def draw_keypoints(image, keypoints):
     """Draw SuperPoint keypoints on the image."""
     img_with_kp = image.copy()
-    # Draw each keypoint as a small circle
-    for kp in keypoints:
-        y, x = kp[0], kp[1]  # keypoints are in (y,x) format
-        conf = kp[2]
-        # Draw circle with size based on confidence
-        radius = 2
-        cv2.circle(img_with_kp, (x, y), radius, (0, 255, 0), -1)
+    if len(keypoints) == 0:
+        return img_with_kp
+
+    # Scatter the circle offsets around every keypoint at once instead of
+    # a Python-level cv2.circle call per point (keypoints are (y,x) format)
+    ys = keypoints[:, 0][:, None] + _KP_OFFSETS[:, 0]
+    xs = keypoints[:, 1][:, None] + _KP_OFFSETS[:, 1]
+
+    # Drop pixels that fall outside the image, like cv2.circle clipping
+    valid = (ys >= 0) & (ys < image.shape[0]) & (xs >= 0) & (xs < image.shape[1])
+    img_with_kp[ys[valid], xs[valid]] = (0, 255, 0)
     return img_with_kp
 
 def save_keypoints_to_csv(keypoints, output_path):
     """Save keypoints to a CSV file."""
-    # Create DataFrame with column names
-    df = pd.DataFrame(keypoints, columns=['y', 'x', 'confidence'])
-    
-    # Sort by confidence (highest to lowest)
-    df = df.sort_values('confidence', ascending=False)
-    
-    # Add index starting from 1
-    df.index = range(1, len(df) + 1)
-    
-    # Save to CSV
-    df.to_csv(output_path)
-    
-    return df
+    # Keypoints already arrive sorted by confidence (highest to lowest),
+    # so write the rows directly instead of building a DataFrame per image
+    with open(output_path, 'w') as f:
+        f.write(',y,x,confidence\n')
+        for i, (y, x, conf) in enumerate(keypoints, 1):
+            f.write(f'{i},{y},{x},{conf}\n')
 
-def process_image(image_path, sess, tensors, img_size, keep_k_points):
-    """Process a single image with SuperPoint."""
+def produce_batches(image_paths, batch_size, img_size, load_color, executor, batch_queue, buffer_pool):
+    """Preprocess batches of images in the executor and queue them for inference."""
     try:
-        # Preprocess image
-        img_preprocessed, img_orig = preprocess_image(image_path, img_size)
-        
-        # Run SuperPoint inference
-        prob_nms = sess.run(
-            tensors['output'],
-            feed_dict={tensors['input']: np.expand_dims(img_preprocessed, 0)}
-        )
-        
-        # Extract keypoints from SuperPoint output
-        keypoint_map = np.squeeze(prob_nms)
-        keypoints = extract_superpoint_keypoints(keypoint_map, keep_k_points)
-    
-        # Convert original image to grayscale for brightness check
-        img_gray = cv2.cvtColor(img_orig, cv2.COLOR_BGR2GRAY)
+        for start in range(0, len(image_paths), batch_size):
+            batch_paths = image_paths[start:start + batch_size]
+            futures = [executor.submit(preprocess_image, p, img_size, load_color)
+                       for p in batch_paths]
+
+            # Stage the batch into a recycled buffer instead of stacking a
+            # freshly allocated array every time; the inference loop hands
+            # the buffer back once TF has copied the feed
+            batch_buf = buffer_pool.get()
+            num_valid = 0
+            orig_imgs = []
+            gray_imgs = []
+            valid_paths = []
+            for image_path, future in zip(batch_paths, futures):
+                try:
+                    img_preprocessed, img_orig, img_gray = future.result()
+                except Exception as e:
+                    print(f"Error processing {image_path}: {str(e)}")
+                    continue
+                batch_buf[num_valid] = img_preprocessed
+                num_valid += 1
+                orig_imgs.append(img_orig)
+                gray_imgs.append(img_gray)
+                valid_paths.append(image_path)
+
+            batch_queue.put((batch_buf, num_valid, orig_imgs, gray_imgs, valid_paths, len(batch_paths)))
+    finally:
+        # Sentinel so the inference loop always terminates
+        batch_queue.put(None)
+
+def select_topk_keypoints(vals, ys, xs):
+    """Build the keypoint array from one image's in-graph top-k output."""
+    # top_k pads with zero-probability pixels when fewer than k detected
+    detected = vals > 0
+    keypoints = np.stack([ys[detected], xs[detected], vals[detected]], axis=-1)
+    return keypoints.astype(int)
+
+def postprocess_image(image_name, topk, img_orig, img_gray, csv_dir, vis_dir):
+    """Extract, filter, draw and save the results for a single image."""
+    try:
+        # Extract keypoints from the in-graph top-k selection
+        keypoints = select_topk_keypoints(*topk)
 
-        # Filter out keypoints on dark pixels
+        # Filter out keypoints on dark pixels (grayscale image comes from
+        # preprocessing, so no second BGR-to-gray conversion here)
         keypoints = filter_dark_keypoints(keypoints, img_gray, 20)
 
-        # Create visualization
-        img_with_kp = draw_keypoints(img_orig, keypoints)
-        
-        return keypoints, img_with_kp
-        
+        # Save CSV; the dirs arrive as plain strings so the per-image
+        # paths are cheap f-strings, not Path arithmetic
+        csv_path = f"{csv_dir}/{image_name}_keypoints.csv"
+        save_keypoints_to_csv(keypoints, csv_path)
+
+        # Create and save visualization unless disabled (vis_dir is None)
+        if vis_dir is not None:
+            img_with_kp = draw_keypoints(img_orig, keypoints)
+            vis_path = f"{vis_dir}/{image_name}_keypoints.jpg"
+            cv2.imwrite(vis_path, img_with_kp)
+        else:
+            vis_path = None
+
+        return {
+            'image_name': image_name,
+            'num_keypoints': len(keypoints),
+            'csv_path': csv_path,
+            'visualization_path': vis_path
+        }
+
     except Exception as e:
-        print(f"Error processing {image_path}: {str(e)}")
-        return None, None
+        print(f"Error processing {image_name}: {str(e)}")
+        return None
+
+def prepare_output_dirs(output_dir, save_visualizations=True):
+    """Clear the output folder and create the csv/visualization subdirs."""
+    if output_dir.exists():
+        shutil.rmtree(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    csv_dir = output_dir / "csv"
+    csv_dir.mkdir(parents=True, exist_ok=True)
+
+    if save_visualizations:
+        vis_dir = output_dir / "visualizations"
+        vis_dir.mkdir(parents=True, exist_ok=True)
+        vis_dir = str(vis_dir)
+    else:
+        vis_dir = None
+
+    # Returned as strings so per-image output paths are plain f-strings
+    return str(csv_dir), vis_dir
+
+def load_superpoint_model(sess, graph, weights_path, batch_size, keep_k_points, img_size):
+    """Load the sp_v6 SavedModel (or frozen .pb) and return its inference callable."""
+    if str(weights_path).endswith(".pb"):
+        # Frozen graph, e.g. the weight-quantized export of quantize_model.py
+        graph_def = tf.GraphDef()
+        with tf.gfile.GFile(str(weights_path), "rb") as f:
+            graph_def.ParseFromString(f.read())
+        with graph.as_default():
+            tf.import_graph_def(graph_def, name="")
+    else:
+        tf.saved_model.loader.load(
+            sess,
+            [tf.saved_model.tag_constants.SERVING],
+            str(weights_path)
+        )
+
+    # Get SuperPoint specific tensors
+    tensors = {
+        'input': graph.get_tensor_by_name('superpoint/image:0'),
+        'output': graph.get_tensor_by_name('superpoint/prob_nms:0')
+    }
+
+    # The stock sp_v6 export unstacks along the batch axis with a fixed
+    # size, so batches larger than the graph supports would fail at
+    # runtime. Clamp batch_size to the graph's static batch dimension
+    # (a re-export with a dynamic batch dim lifts this limit). Frozen
+    # graphs re-import with a fully unknown output shape; assume the
+    # sp_v6 fixed batch of 1 rather than a dynamic dim the export
+    # doesn't actually have.
+    output_shape = tensors['output'].shape
+    graph_batch = output_shape.as_list()[0] if output_shape.ndims is not None else 1
+    if graph_batch is not None and batch_size > graph_batch:
+        print(f"Model graph only supports batch size {graph_batch}, "
+              f"reducing batch_size from {batch_size}")
+        batch_size = graph_batch
+
+    # Pin the known input geometry on the placeholder so shape inference
+    # (and the JIT) can specialize kernels instead of planning for fully
+    # dynamic spatial dims; the batch dim stays free for tail batches
+    width, height = img_size
+    tensors['input'].set_shape([None, height, width, 1])
+
+    # Select the top-k pixels inside the graph so each image hands the CPU
+    # k (y, x, prob) triples instead of the full probability map. The
+    # reshape and index decomposition use the static geometry rather than
+    # recovering it with tf.shape at run time.
+    with graph.as_default():
+        prob_nms = tensors['output']
+        flat = tf.reshape(prob_nms, [-1, height * width])
+        vals, idx = tf.nn.top_k(flat, k=keep_k_points)
+        ys = idx // width
+        xs = idx % width
+
+    # Precompile the run call once: make_callable is TF1's fast path
+    # that skips per-call feed_dict packing and fetch-name resolution
+    run_inference = sess.make_callable(
+        [vals, ys, xs], feed_list=[tensors['input']]
+    )
+
+    return run_inference, batch_size
+
+def make_session_config():
+    """Build a TF session config tuned for inference."""
+    # Grow GPU memory on demand instead of reserving it all up front, and
+    # let the grappler optimizer fold/fuse ops in the loaded graph
+    config = tf.ConfigProto()
+    config.gpu_options.allow_growth = True
+    config.graph_options.optimizer_options.global_jit_level = tf.OptimizerOptions.ON_1
+    return config
 
-def run_superpoint_on_folder(input_folder, weights_path, output_dir, img_size=(640, 480), keep_k_points=1000):
+def run_superpoint_on_folder(input_folder, weights_path, output_dir, img_size=(640, 480), keep_k_points=1000, batch_size=8, save_visualizations=True):
     """Run SuperPoint (sp_v6) model on all images in a folder."""
-    
+
     # Setup paths
     input_folder = Path(input_folder)
     output_dir = Path(output_dir)
     weights_dir = Path(weights_path)
-    
-     # Clear output folder if it exists
-    if output_dir.exists():
-        shutil.rmtree(output_dir)
-    output_dir.mkdir(parents=True, exist_ok=True)
 
     # Create output directories
-    csv_dir = output_dir / "csv"
-    vis_dir = output_dir / "visualizations"
-    csv_dir.mkdir(parents=True, exist_ok=True)
-    vis_dir.mkdir(parents=True, exist_ok=True)
-    
-    # Verify weights path contains sp_v6
-    assert weights_dir.name == "sp_v6", "Must use sp_v6 weights!"
-    
-    # Get list of images
-    image_extensions = ['.jpg', '.jpeg', '.png', '.bmp']
-    image_paths = []
-    for ext in image_extensions:
-        image_paths.extend(input_folder.glob(f'*{ext}'))
-        image_paths.extend(input_folder.glob(f'*{ext.upper()}'))
+    csv_dir, vis_dir = prepare_output_dirs(output_dir, save_visualizations)
+
+    # Verify weights path contains sp_v6 (SavedModel dir or quantized .pb)
+    assert weights_dir.stem.startswith("sp_v6"), "Must use sp_v6 weights!"
     
+    # Get list of images in one directory scan (glob would stat the folder
+    # once per extension) and sort for a deterministic processing order
+    image_extensions = {'.jpg', '.jpeg', '.png', '.bmp'}
+    image_paths = sorted(
+        Path(entry.path) for entry in os.scandir(input_folder)
+        if os.path.splitext(entry.name)[1].lower() in image_extensions
+    )
+
     if not image_paths:
         raise ValueError(f"No images found in {input_folder}")
     
@@ -141,53 +374,66 @@ def run_superpoint_on_folder(input_folder, weights_path, output_dir, img_size=(6
     
     # Initialize TensorFlow graph
     graph = tf.Graph()
-    with tf.Session(graph=graph) as sess:
+    with tf.Session(graph=graph, config=make_session_config()) as sess:
         # Load the SuperPoint model
-        tf.saved_model.loader.load(
-            sess,
-            [tf.saved_model.tag_constants.SERVING],
-            str(weights_path)
+        run_inference, batch_size = load_superpoint_model(
+            sess, graph, weights_path, batch_size, keep_k_points, img_size
         )
 
-        # Get SuperPoint specific tensors
-        tensors = {
-            'input': graph.get_tensor_by_name('superpoint/image:0'),
-            'output': graph.get_tensor_by_name('superpoint/prob_nms:0')
-        }
+        # Three-stage pipeline: a producer thread preprocesses upcoming
+        # batches and a worker pool post-processes finished ones, so disk
+        # I/O and CPU work overlap with inference on the main thread.
+        cv2.setNumThreads(1)  # our own pools provide the parallelism
+        batch_queue = queue.Queue(maxsize=4)
+
+        # Staging buffers recycled between producer and inference loop:
+        # queue depth plus one in flight on each side
+        width, height = img_size
+        buffer_pool = queue.Queue()
+        for _ in range(6):
+            buffer_pool.put(np.empty((batch_size, height, width, 1), np.float32))
 
-        # Process each image
-        results = []
-        for image_path in tqdm(image_paths, desc="Processing images"):
-            # Process image
-            keypoints, img_with_kp = process_image(
-                image_path, 
-                sess, 
-                tensors, 
-                img_size, 
-                keep_k_points
+        futures = []
+        with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+            producer = threading.Thread(
+                target=produce_batches,
+                args=(image_paths, batch_size, img_size, save_visualizations,
+                      executor, batch_queue, buffer_pool),
+                daemon=True
             )
-            
-            if keypoints is None:
-                continue
-                
-            # Save results
-            image_name = image_path.stem
-            
-            # Save CSV
-            csv_path = csv_dir / f"{image_name}_keypoints.csv"
-            df = save_keypoints_to_csv(keypoints, csv_path)
-            
-            # Save visualization
-            vis_path = vis_dir / f"{image_name}_keypoints.jpg"
-            cv2.imwrite(str(vis_path), img_with_kp)
-            
-            results.append({
-                'image_name': image_name,
-                'num_keypoints': len(keypoints),
-                'csv_path': csv_path,
-                'visualization_path': vis_path
-            })
-            
+            producer.start()
+
+            with tqdm(total=len(image_paths), desc="Processing images") as pbar:
+                while True:
+                    item = batch_queue.get()
+                    if item is None:
+                        break
+                    batch_buf, num_valid, orig_imgs, gray_imgs, valid_paths, num_paths = item
+
+                    if num_valid:
+                        # Run SuperPoint inference once for the whole batch
+                        vals, ys, xs = run_inference(batch_buf[:num_valid])
+
+                        # Hand post-processing and saving to the worker pool
+                        for j, image_path in enumerate(valid_paths):
+                            futures.append(executor.submit(
+                                postprocess_image,
+                                image_path.stem,
+                                (vals[j], ys[j], xs[j]),
+                                orig_imgs[j],
+                                gray_imgs[j],
+                                csv_dir,
+                                vis_dir
+                            ))
+
+                    # TF copied the feed during run_inference; recycle
+                    buffer_pool.put(batch_buf)
+                    pbar.update(num_paths)
+
+            producer.join()
+            results = [r for r in (f.result() for f in futures) if r is not None]
+
+
         # Create summary CSV
         summary_df = pd.DataFrame(results)
         summary_path = output_dir / "processing_summary.csv"
@@ -196,6 +442,114 @@ def run_superpoint_on_folder(input_folder, weights_path, output_dir, img_size=(6
         
         return summary_df
 
+def read_video_frames(video_path, img_size, fps=10):
+    """Yield grayscale frames piped from ffmpeg without touching disk."""
+    width, height = img_size
+    cmd = [
+        "ffmpeg", "-v", "error", "-i", str(video_path),
+        "-vf", f"fps={fps},scale={width}:{height}",
+        "-f", "rawvideo", "-pix_fmt", "gray", "-"
+    ]
+    # Large stdout buffer keeps syscall overhead off the frame loop
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, bufsize=1 << 20)
+    frame_bytes = width * height
+    try:
+        while True:
+            buf = proc.stdout.read(frame_bytes)
+            if len(buf) < frame_bytes:
+                break
+            yield np.frombuffer(buf, np.uint8).reshape(height, width)
+    finally:
+        proc.stdout.close()
+        proc.wait()
+
+def run_superpoint_on_video(video_path, weights_path, output_dir, img_size=(640, 480), fps=10, keep_k_points=1000, batch_size=8, save_visualizations=True):
+    """Run SuperPoint (sp_v6) directly on frames decoded from a video.
+
+    Frames are piped from ffmpeg as raw grayscale into memory, skipping
+    the PNG write/read roundtrip of the video2img.py + folder flow.
+    """
+
+    # Setup paths
+    video_path = Path(video_path)
+    output_dir = Path(output_dir)
+    weights_dir = Path(weights_path)
+
+    # Create output directories
+    csv_dir, vis_dir = prepare_output_dirs(output_dir, save_visualizations)
+
+    # Verify weights path contains sp_v6 (SavedModel dir or quantized .pb)
+    assert weights_dir.stem.startswith("sp_v6"), "Must use sp_v6 weights!"
+
+    # Initialize TensorFlow graph
+    graph = tf.Graph()
+    with tf.Session(graph=graph, config=make_session_config()) as sess:
+        # Load the SuperPoint model
+        run_inference, batch_size = load_superpoint_model(
+            sess, graph, weights_path, batch_size, keep_k_points, img_size
+        )
+
+        # ffmpeg decodes ahead of us in its own process; a worker pool
+        # handles post-processing while the main thread runs the network
+        cv2.setNumThreads(1)
+        futures = []
+        with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+            # One staging buffer is enough here: the flush runs inference
+            # before the next frame is written into the buffer
+            width, height = img_size
+            batch_buf = np.empty((batch_size, height, width, 1), np.float32)
+            num_valid = 0
+            orig_imgs = []
+            gray_imgs = []
+            image_names = []
+
+            def flush_batch():
+                nonlocal num_valid
+                vals, ys, xs = run_inference(batch_buf[:num_valid])
+                for j, image_name in enumerate(image_names):
+                    futures.append(executor.submit(
+                        postprocess_image,
+                        image_name,
+                        (vals[j], ys[j], xs[j]),
+                        orig_imgs[j],
+                        gray_imgs[j],
+                        csv_dir,
+                        vis_dir
+                    ))
+                num_valid = 0
+                orig_imgs.clear()
+                gray_imgs.clear()
+                image_names.clear()
+
+            frames = read_video_frames(video_path, img_size, fps)
+            for frame_idx, frame in enumerate(tqdm(frames, desc="Processing frames"), 1):
+                # Normalize to [0,1] float32 straight into the staging row
+                np.multiply(frame[..., None], np.float32(1.0 / 255.0),
+                            out=batch_buf[num_valid])
+                num_valid += 1
+                orig_imgs.append(
+                    cv2.cvtColor(frame, cv2.COLOR_GRAY2BGR) if save_visualizations else None
+                )
+                gray_imgs.append(frame)
+                image_names.append(f"{video_path.stem}_frame_{frame_idx:04d}")
+
+                if num_valid == batch_size:
+                    flush_batch()
+
+            # Tail batch
+            if num_valid:
+                flush_batch()
+
+            results = [r for r in (f.result() for f in futures) if r is not None]
+
+        # Create summary CSV
+        summary_df = pd.DataFrame(results)
+        summary_path = output_dir / "processing_summary.csv"
+        summary_df.to_csv(summary_path, index=False)
+        print(f"\nProcessing complete! Summary saved to {summary_path}")
+
+        return summary_df
+
 if __name__ == "__main__":
     # Set paths
     INPUT_FOLDER = "1_video_processing/output_img"  # Folder containing images